@@ -4,16 +4,20 @@ Single file that runs everything: backend + frontend
 Access via: http://localhost:5000 or http://your-ip:5000
 """
 
-from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO, emit
-import threading
+from quart import Quart, Response, request
+import socketio
+import orjson
+import aiohttp
+import asyncio
+import hashlib
 import time
 import random
 import math
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice, takewhile
 import json
 import os
-from pathlib import Path
 
 # Try to import optional dependencies
 try:
@@ -23,43 +27,68 @@ except:
     VOICE_AVAILABLE = False
 
 try:
-    import firebase_admin
-    from firebase_admin import credentials, db
-    FIREBASE_AVAILABLE = True
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
 except:
-    FIREBASE_AVAILABLE = False
+    AHOCORASICK_AVAILABLE = False
 
 try:
-    from telegram import Bot
-    import asyncio
-    TELEGRAM_AVAILABLE = True
+    import redis.asyncio as redis_async
+    REDIS_AVAILABLE = True
 except:
-    TELEGRAM_AVAILABLE = False
+    REDIS_AVAILABLE = False
 
 # ==================== CONFIGURATION ====================
 class Config:
     # System Settings
     SIMULATION_MODE = True
-    DISTRESS_KEYWORDS = ["help", "save me", "emergency", "danger", "police"]
+    DISTRESS_KEYWORDS = frozenset(
+        k.lower() for k in ("help", "save me", "emergency", "danger", "police")
+    )
     GPS_UPDATE_INTERVAL = 2  # seconds
+    BATCH_WINDOW_MS = 300  # coalesce location emits into one broadcast per window
+    UPDATE_RATES = {'fast': 1, 'normal': 2, 'slow': 5}  # room -> emit cadence in seconds
+    SAFE_WRITE_TTL = 60  # seconds between "safe" events while stationary
+    STATUS_KEEPALIVE = 30  # seconds between unchanged status_update emits
+    ENHANCED_MONITOR_SECS = 30  # fast-tick window after a distress detection
     
     # Firebase (Optional - will work without it)
-    FIREBASE_CREDENTIALS = os.getenv("FIREBASE_CREDENTIALS", "firebase-credentials.json")
-    FIREBASE_DATABASE_URL = os.getenv("FIREBASE_URL", "https://your-project.firebaseio.com")
+    FIREBASE_DATABASE_URL = os.getenv("FIREBASE_URL", "")
+    FIREBASE_AUTH_TOKEN = os.getenv("FIREBASE_AUTH_TOKEN", "")
+    FIREBASE_FLUSH_INTERVAL = 5  # seconds between batched event writes
+
+    # Redis (Optional - will work without it)
+    REDIS_URL = os.getenv("REDIS_URL", "")
     
     # Telegram (Optional - will work without it)
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-    TELEGRAM_CHAT_IDS = os.getenv("TELEGRAM_CHAT_IDS", "").split(",")
+    TELEGRAM_CHAT_IDS = tuple(c for c in os.getenv("TELEGRAM_CHAT_IDS", "").split(",") if c)
     
     # Simulation
     SIMULATION_GPS_CENTER = (28.6139, 77.2090)  # Delhi
     SIMULATION_GPS_RADIUS = 0.01
     SIMULATION_VOICE_TRIGGER_PROB = 0.15
 
-# ==================== FLASK APP SETUP ====================
-app = Flask(__name__)
+# ==================== ASGI APP SETUP ====================
+app = Quart(__name__)
 app.config['SECRET_KEY'] = 'women-safety-secret-key-2024'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# With Redis configured, emits from any worker fan out to all clients
+# through one PUBLISH, so workers can scale horizontally without sticky
+# sessions
+_client_manager = (socketio.AsyncRedisManager(Config.REDIS_URL)
+                   if REDIS_AVAILABLE and Config.REDIS_URL else None)
+
+# permessage-deflate on websocket frames is negotiated by the 'websockets'
+# backend (see Procfile); http_compression covers the polling transport
+sio = socketio.AsyncServer(
+    async_mode='asgi',
+    cors_allowed_origins='*',
+    client_manager=_client_manager,
+    serializer='msgpack',
+    http_compression=True,
+    compression_threshold=256
+)
+asgi = socketio.ASGIApp(sio, app)
 
 # ==================== GLOBAL STATE ====================
 class SystemState:
@@ -67,11 +96,22 @@ class SystemState:
         self.running = False
         self.current_location = None
         self.current_status = "safe"
-        self.events = []
+        self.events = deque(maxlen=50)  # newest first, bounded
+        self.events_version = 0  # bumped on every append; doubles as the event seq and drives ETags
         self.connected_clients = 0
         self.firebase_connected = False
         self.telegram_enabled = False
-        
+        self.monitor_task = None
+        self.broadcast_task = None
+        self.pending_locations = {room: deque() for room in Config.UPDATE_RATES}
+        self.room_last_flush = {room: 0.0 for room in Config.UPDATE_RATES}
+        self.last_broadcast_status = None
+        self.last_status_emit = 0.0
+        self.http = None  # shared aiohttp session, created at startup
+        self.last_safe_cell = None  # quantized (lat, lon) of the last "safe" write
+        self.last_safe_write = 0.0
+        self.enhanced_until = 0.0  # deadline of the post-distress fast-tick window
+
         # Simulation state
         self.sim_lat = Config.SIMULATION_GPS_CENTER[0]
         self.sim_lon = Config.SIMULATION_GPS_CENTER[1]
@@ -79,15 +119,50 @@ class SystemState:
 
 state = SystemState()
 
+async def record_event(event):
+    """Append an event (newest first) and bump the version counter"""
+    # With Redis configured, seqs come from the shared INCR counter so
+    # they stay monotonic across workers and restarts; otherwise fall
+    # back to the worker-local counter
+    seq = await redis_handler.next_seq()
+    if seq is None:
+        state.events_version += 1
+        seq = state.events_version
+    else:
+        state.events_version = seq
+    event['seq'] = seq
+    state.events.appendleft(event)
+    # Mirror to Redis so other workers see the same history
+    if redis_handler.connected:
+        asyncio.ensure_future(redis_handler.push_event(event))
+
+def queue_location(location):
+    """Queue a location for each rate room's next batched broadcast"""
+    for pending in state.pending_locations.values():
+        pending.append(location)
+
+def _now_iso():
+    """Current UTC time as an ISO-8601 'Z' string (millisecond resolution)"""
+    now = time.time()
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now)) + f'.{int(now * 1000) % 1000:03d}Z'
+
 # ==================== GPS SIMULATION ====================
+# Hot-path bindings: skip per-call attribute lookups and the lock on the
+# global random instance
+_cos = math.cos
+_sin = math.sin
+_rad = 0.017453292519943295  # degrees -> radians multiplier
+_rng = random.Random()
+
 def get_simulated_gps():
     """Generate simulated GPS data"""
-    state.sim_angle += random.uniform(-30, 30)
-    distance = random.uniform(0, Config.SIMULATION_GPS_RADIUS * 0.1)
-    
-    state.sim_lat += distance * math.cos(math.radians(state.sim_angle))
-    state.sim_lon += distance * math.sin(math.radians(state.sim_angle))
-    
+    state.sim_angle += _rng.uniform(-30, 30)
+    distance = _rng.uniform(0, Config.SIMULATION_GPS_RADIUS * 0.1)
+
+    angle_rad = state.sim_angle * _rad
+    state.sim_lat += distance * _cos(angle_rad)
+    state.sim_lon += distance * _sin(angle_rad)
+
     # Keep within bounds
     center_lat, center_lon = Config.SIMULATION_GPS_CENTER
     max_dist = Config.SIMULATION_GPS_RADIUS
@@ -98,78 +173,188 @@ def get_simulated_gps():
     if abs(state.sim_lon - center_lon) > max_dist:
         state.sim_lon = center_lon + (max_dist if state.sim_lon > center_lon else -max_dist)
     
+    # Raw floats: msgpack encodes them as fixed 8-byte doubles, so there
+    # is nothing to gain from rounding before the wire
     return {
-        'latitude': round(state.sim_lat, 6),
-        'longitude': round(state.sim_lon, 6),
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'accuracy': random.uniform(5, 15),
+        'latitude': state.sim_lat,
+        'longitude': state.sim_lon,
+        'timestamp': _now_iso(),
+        'accuracy': _rng.uniform(5, 15),
         'source': 'simulated'
     }
 
-# ==================== VOICE SIMULATION ====================
+# ==================== VOICE DETECTION ====================
+# Compile the keyword list into an Aho-Corasick automaton once at import:
+# scanning a transcript is then a single pass instead of one substring
+# search per keyword, and adding keywords costs nothing at match time
+if AHOCORASICK_AVAILABLE:
+    _keyword_automaton = ahocorasick.Automaton()
+    for _kw in Config.DISTRESS_KEYWORDS:
+        _keyword_automaton.add_word(_kw, _kw)
+    _keyword_automaton.make_automaton()
+else:
+    _keyword_automaton = None
+
+# random.choice needs a sequence, so keep a tuple view for the simulator
+_KEYWORD_CHOICES = tuple(Config.DISTRESS_KEYWORDS)
+
+def match_distress_keyword(transcript):
+    """Return the first distress keyword found in a transcript, or None"""
+    text = transcript.lower()
+    if _keyword_automaton is not None:
+        match = next(_keyword_automaton.iter(text), None)
+        return match[1] if match else None
+    # Fallback: linear scan when pyahocorasick is not installed
+    for keyword in Config.DISTRESS_KEYWORDS:
+        if keyword in text:
+            return keyword
+    return None
+
 def simulate_voice_detection():
     """Simulate voice detection"""
-    if random.random() < Config.SIMULATION_VOICE_TRIGGER_PROB:
-        keyword = random.choice(Config.DISTRESS_KEYWORDS)
+    if _rng.random() < Config.SIMULATION_VOICE_TRIGGER_PROB:
+        keyword = _rng.choice(_KEYWORD_CHOICES)
         return True, keyword, 0.85
     return False, None, 0.0
 
 # ==================== FIREBASE HANDLER ====================
 class FirebaseHandler:
+    """Firebase RTDB over REST, sharing the app-wide aiohttp session"""
+
+    def __init__(self):
+        self.connected = bool(Config.FIREBASE_DATABASE_URL)
+        self.base_url = Config.FIREBASE_DATABASE_URL.rstrip('/')
+        self.pending = deque()
+        self.flush_task = None
+        if self.connected:
+            print("✓ Firebase REST configured")
+
+    @property
+    def _params(self):
+        return {'auth': Config.FIREBASE_AUTH_TOKEN} if Config.FIREBASE_AUTH_TOKEN else None
+
+    def store_event(self, event_data):
+        """Queue an event; the flush task writes batches to Firebase"""
+        if not self.connected:
+            return False
+        self.pending.append(event_data)
+        return True
+
+    async def flush_loop(self):
+        """Drain queued events as one batched write per interval"""
+        while True:
+            await asyncio.sleep(Config.FIREBASE_FLUSH_INTERVAL)
+            if not self.pending:
+                continue
+            batch = list(self.pending)
+            self.pending.clear()
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print(f"⚠ Firebase flush failed: {e}")
+
+    async def _flush(self, batch):
+        # One multi-path PATCH for the whole batch instead of a push()
+        # per event; the status PUT rides the same keep-alive connection
+        base = int(time.time() * 1000)
+        last = batch[-1]
+        async with state.http.patch(
+            f'{self.base_url}/women_safety/events.json',
+            params=self._params,
+            json={f'{base}-{i}': event for i, event in enumerate(batch)}
+        ) as resp:
+            resp.raise_for_status()
+        async with state.http.put(
+            f'{self.base_url}/women_safety/status.json',
+            params=self._params,
+            json={
+                'latitude': last['latitude'],
+                'longitude': last['longitude'],
+                'status': last['status'],
+                'last_update': last['timestamp']
+            }
+        ) as resp:
+            resp.raise_for_status()
+
+firebase_handler = FirebaseHandler()
+state.firebase_connected = firebase_handler.connected
+
+# ==================== REDIS HANDLER ====================
+class RedisHandler:
     def __init__(self):
         self.connected = False
-        if FIREBASE_AVAILABLE and os.path.exists(Config.FIREBASE_CREDENTIALS):
+        self.client = None
+        if REDIS_AVAILABLE and Config.REDIS_URL:
             try:
-                if not firebase_admin._apps:
-                    cred = credentials.Certificate(Config.FIREBASE_CREDENTIALS)
-                    firebase_admin.initialize_app(cred, {
-                        'databaseURL': Config.FIREBASE_DATABASE_URL
-                    })
-                self.db_ref = db.reference()
+                self.client = redis_async.from_url(Config.REDIS_URL)
                 self.connected = True
-                print("✓ Firebase connected")
+                print("✓ Redis configured")
             except Exception as e:
-                print(f"⚠ Firebase not available: {e}")
-    
-    def store_event(self, event_data):
+                print(f"⚠ Redis not available: {e}")
+
+    async def cache_status(self, status_dict):
         if not self.connected:
             return False
         try:
-            self.db_ref.child('women_safety/events').push(event_data)
-            self.db_ref.child('women_safety/status').set({
-                'latitude': event_data['latitude'],
-                'longitude': event_data['longitude'],
-                'status': event_data['status'],
-                'last_update': event_data['timestamp']
-            })
+            await self.client.set('ws:status', json.dumps(status_dict), ex=60)
             return True
         except:
             return False
 
-firebase_handler = FirebaseHandler()
-state.firebase_connected = firebase_handler.connected
+    async def get_status(self):
+        if not self.connected:
+            return None
+        try:
+            cached = await self.client.get('ws:status')
+            return json.loads(cached) if cached else None
+        except:
+            return None
 
-# ==================== TELEGRAM HANDLER ====================
-class TelegramHandler:
-    def __init__(self):
-        self.enabled = False
-        if TELEGRAM_AVAILABLE and Config.TELEGRAM_BOT_TOKEN:
-            try:
-                self.bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
-                self.enabled = True
-                print("✓ Telegram bot enabled")
-            except Exception as e:
-                print(f"⚠ Telegram not available: {e}")
-    
-    async def send_alert(self, location, keyword):
-        if not self.enabled:
+    async def next_seq(self):
+        """Allocate the next event seq from the shared counter"""
+        if not self.connected:
+            return None
+        try:
+            return await self.client.incr('ws:seq')
+        except:
+            return None
+
+    async def current_seq(self):
+        """Latest allocated event seq; None when unavailable"""
+        if not self.connected:
+            return None
+        try:
+            return int(await self.client.get('ws:seq') or 0)
+        except:
+            return None
+
+    async def push_event(self, event):
+        if not self.connected:
             return False
-        
-        lat = location['latitude']
-        lon = location['longitude']
-        maps_link = f"https://www.google.com/maps?q={lat},{lon}"
-        
-        message = f"""
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.lpush('ws:events', json.dumps(event))
+                pipe.ltrim('ws:events', 0, 49)
+                await pipe.execute()
+            return True
+        except:
+            return False
+
+    async def get_events(self, limit=50):
+        """Shared event history, newest first; None when unavailable"""
+        if not self.connected:
+            return None
+        try:
+            raw = await self.client.lrange('ws:events', 0, limit - 1)
+            return [json.loads(item) for item in raw]
+        except:
+            return None
+
+redis_handler = RedisHandler()
+
+# ==================== TELEGRAM HANDLER ====================
+# Built once at import; send_alert only fills in the blanks
+_ALERT_TEMPLATE = """
 🚨 EMERGENCY ALERT 🚨
 
 ⚠️ Distress Keyword: "{keyword}"
@@ -177,45 +362,102 @@ class TelegramHandler:
 📍 Location:
    {lat:.6f}, {lon:.6f}
 
-🕐 Time: {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}
+🕐 Time: {time} UTC
 
-🗺 Map: {maps_link}
+🗺 Map: https://www.google.com/maps?q={lat:.6f},{lon:.6f}
 """
-        
-        success = False
-        for chat_id in Config.TELEGRAM_CHAT_IDS:
-            if chat_id:
-                try:
-                    await self.bot.send_message(chat_id=chat_id, text=message)
-                    success = True
-                except:
-                    pass
-        return success
+
+class TelegramHandler:
+    """Telegram Bot API over REST, sharing the app-wide aiohttp session"""
+
+    def __init__(self):
+        self.enabled = bool(Config.TELEGRAM_BOT_TOKEN and Config.TELEGRAM_CHAT_IDS)
+        self.api_url = f"https://api.telegram.org/bot{Config.TELEGRAM_BOT_TOKEN}/sendMessage"
+        if self.enabled:
+            print("✓ Telegram bot enabled")
+
+    async def _send(self, chat_id, text):
+        async with state.http.post(
+            self.api_url,
+            json={'chat_id': chat_id, 'text': text}
+        ) as resp:
+            return resp.status == 200
+
+    async def send_alert(self, location, keyword):
+        if not self.enabled:
+            return False
+
+        message = _ALERT_TEMPLATE.format_map({
+            'keyword': keyword,
+            'lat': location['latitude'],
+            'lon': location['longitude'],
+            'time': datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        })
+
+        # Fan out to all chats concurrently: latency is the slowest RTT,
+        # not the sum of them
+        results = await asyncio.gather(
+            *(self._send(chat_id, message) for chat_id in Config.TELEGRAM_CHAT_IDS),
+            return_exceptions=True
+        )
+        return any(r is True for r in results)
 
 telegram_handler = TelegramHandler()
 state.telegram_enabled = telegram_handler.enabled
 
-# ==================== MONITORING THREAD ====================
-def monitoring_loop():
-    """Main monitoring loop running in background"""
+# ==================== BROADCAST TASK ====================
+async def broadcast_loop():
+    """Coalesce pending updates into one emit per batch window"""
+    window = Config.BATCH_WINDOW_MS / 1000.0
+
+    while state.running:
+        # Flush each rate room on its own cadence; emitting to a room is
+        # an indexed-set walk, so idle/backgrounded rooms cost nothing
+        now = time.time()
+        for room, interval in Config.UPDATE_RATES.items():
+            pending = state.pending_locations[room]
+            if pending and now - state.room_last_flush[room] >= interval:
+                state.room_last_flush[room] = now
+                points = list(pending)
+                pending.clear()
+                await sio.emit('location_batch', points, room=room)
+
+        # Re-broadcast status only on a transition, plus a periodic
+        # keepalive; clients treat silence as "no change" and get
+        # liveness from the location stream
+        now = time.time()
+        if (state.current_status != state.last_broadcast_status
+                or now - state.last_status_emit > Config.STATUS_KEEPALIVE):
+            state.last_broadcast_status = state.current_status
+            state.last_status_emit = now
+            await sio.emit('status_update', {
+                'status': state.current_status,
+                'timestamp': _now_iso()
+            })
+
+        await asyncio.sleep(window)
+
+# ==================== MONITORING TASK ====================
+async def monitoring_loop():
+    """Main monitoring loop running as a background task"""
     print("🚀 Monitoring loop started")
-    
+
     while state.running:
         try:
             # Get GPS location
             location = get_simulated_gps()
             state.current_location = location
-            
-            # Emit location update to all clients
-            socketio.emit('location_update', location)
-            
+
+            # Queue location update for the batched broadcast
+            queue_location(location)
+
             # Check for distress
             detected, keyword, confidence = simulate_voice_detection()
-            
+
             if detected:
                 print(f"🚨 DISTRESS DETECTED: {keyword}")
                 state.current_status = "distress"
-                
+
                 # Create event
                 event = {
                     'latitude': location['latitude'],
@@ -225,36 +467,39 @@ def monitoring_loop():
                     'keyword': keyword,
                     'accuracy': location['accuracy']
                 }
-                
+
                 # Store event
-                state.events.insert(0, event)
-                if len(state.events) > 50:
-                    state.events.pop()
-                
+                await record_event(event)
+
                 # Save to Firebase
                 firebase_handler.store_event(event)
-                
-                # Send Telegram alert
+
+                # Send Telegram alert as its own task so the tick does
+                # not wait on the Bot API round-trip
                 if telegram_handler.enabled:
-                    try:
-                        asyncio.run(telegram_handler.send_alert(location, keyword))
-                    except:
-                        pass
-                
+                    asyncio.create_task(telegram_handler.send_alert(location, keyword))
+
                 # Emit emergency alert
-                socketio.emit('emergency_alert', event)
-                
-                # Enhanced monitoring for 30 seconds
-                for i in range(15):
-                    location = get_simulated_gps()
-                    socketio.emit('location_update', location)
-                    time.sleep(2)
-                
-                state.current_status = "safe"
-            
+                await sio.emit('emergency_alert', event)
+
+                # Enhanced monitoring: tick faster until the window
+                # expires instead of sleeping the loop for 30s; repeat
+                # detections just extend the window
+                state.enhanced_until = time.time() + Config.ENHANCED_MONITOR_SECS
+
+            elif state.current_status == "distress":
+                if time.time() >= state.enhanced_until:
+                    state.current_status = "safe"
+
             else:
-                # Store safe status periodically
-                if len(state.events) % 10 == 0:
+                # Store safe status only when we actually moved (~100m
+                # cell) or the TTL expired - the old len(events) % 10
+                # check fired on every tick while the list was empty
+                cell = (round(location['latitude'], 3), round(location['longitude'], 3))
+                now = time.time()
+                if cell != state.last_safe_cell or now - state.last_safe_write >= Config.SAFE_WRITE_TTL:
+                    state.last_safe_cell = cell
+                    state.last_safe_write = now
                     event = {
                         'latitude': location['latitude'],
                         'longitude': location['longitude'],
@@ -262,33 +507,57 @@ def monitoring_loop():
                         'status': 'safe',
                         'accuracy': location['accuracy']
                     }
-                    state.events.insert(0, event)
+                    await record_event(event)
                     firebase_handler.store_event(event)
-            
-            # Update status
-            socketio.emit('status_update', {
-                'status': state.current_status,
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            })
-            
-            time.sleep(Config.GPS_UPDATE_INTERVAL)
-        
+
+            # Write-through cache for dashboard reads
+            await redis_handler.cache_status(status_payload())
+
+            # 1s cadence while the enhanced window is open, normal otherwise
+            if time.time() < state.enhanced_until:
+                await asyncio.sleep(1)
+            else:
+                await asyncio.sleep(Config.GPS_UPDATE_INTERVAL)
+
         except Exception as e:
             print(f"Error in monitoring loop: {e}")
-            time.sleep(1)
-    
+            await asyncio.sleep(1)
+
     print("🛑 Monitoring loop stopped")
 
-# ==================== FLASK ROUTES ====================
+# ==================== HTTP ROUTES ====================
+@app.before_serving
+async def startup():
+    """Create the shared HTTP session and start the Firebase writer"""
+    state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=75)
+    )
+    if firebase_handler.connected:
+        firebase_handler.flush_task = asyncio.create_task(firebase_handler.flush_loop())
+
+@app.after_serving
+async def shutdown():
+    """Close the shared HTTP session"""
+    if state.http:
+        await state.http.close()
+
 @app.route('/')
-def index():
+async def index():
     """Main dashboard page"""
-    return render_template('index.html')
+    if request.headers.get('If-None-Match') == _INDEX_ETAG:
+        return '', 304
+    response = Response(INDEX_HTML, mimetype='text/html')
+    response.headers['ETag'] = _INDEX_ETAG
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
 
-@app.route('/api/status')
-def get_status():
-    """Get current system status"""
-    return jsonify({
+def ojson(obj):
+    """JSON response via orjson (SIMD-accelerated C encoder)"""
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
+def status_payload():
+    """Current system status as a dict"""
+    return {
         'running': state.running,
         'status': state.current_status,
         'location': state.current_location,
@@ -296,85 +565,155 @@ def get_status():
         'firebase_connected': state.firebase_connected,
         'telegram_enabled': state.telegram_enabled,
         'total_events': len(state.events)
-    })
+    }
+
+@app.route('/api/status')
+async def get_status():
+    """Get current system status"""
+    # Serve the cached view when Redis is available so HTTP readers
+    # never contend with the monitor tick
+    cached = await redis_handler.get_status()
+    if cached is not None:
+        return ojson(cached)
+    return ojson(status_payload())
 
 @app.route('/api/events')
-def get_events():
+async def get_events():
     """Get recent events"""
     limit = request.args.get('limit', 20, type=int)
-    return jsonify({
-        'events': state.events[:limit]
+    since = request.args.get('since', 0, type=int)
+
+    # With Redis configured, serve the shared mirror so every worker
+    # returns the same history; otherwise use the worker-local deque.
+    # With a cursor, return only the entries newer than it (both views
+    # are newest-first) instead of retransmitting the whole window
+    shared = await redis_handler.get_events()
+    if shared is not None:
+        # The shared counter, not the newest mirrored entry, is the
+        # validator: it never moves backwards across workers
+        version = await redis_handler.current_seq()
+        if version is None:
+            version = shared[0].get('seq', 0) if shared else 0
+        if since:
+            events = [e for e in shared if e.get('seq', 0) > since][:limit]
+        else:
+            events = shared[:limit]
+    else:
+        version = state.events_version
+        if since:
+            events = list(islice(takewhile(lambda e: e['seq'] > since, state.events), limit))
+        else:
+            events = list(islice(state.events, limit))
+
+    # Events only change on append, so the version counter is a cheap
+    # validator: idle dashboards get an empty 304 instead of the payload
+    etag = f'W/"{version}-{limit}-{since}"'
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+
+    response = ojson({
+        'events': events,
+        'cursor': version
     })
+    response.headers['ETag'] = etag
+    return response
 
 @app.route('/api/start', methods=['POST'])
-def start_system():
+async def start_system():
     """Start monitoring system"""
     if not state.running:
         state.running = True
-        thread = threading.Thread(target=monitoring_loop, daemon=True)
-        thread.start()
-        return jsonify({'success': True, 'message': 'System started'})
-    return jsonify({'success': False, 'message': 'Already running'})
+        state.monitor_task = asyncio.create_task(monitoring_loop())
+        state.broadcast_task = asyncio.create_task(broadcast_loop())
+        return ojson({'success': True, 'message': 'System started'})
+    return ojson({'success': False, 'message': 'Already running'})
 
 @app.route('/api/stop', methods=['POST'])
-def stop_system():
+async def stop_system():
     """Stop monitoring system"""
     state.running = False
-    return jsonify({'success': True, 'message': 'System stopped'})
+    # Rewrite the cached view right away; otherwise /api/status keeps
+    # serving running=true until the TTL expires
+    await redis_handler.cache_status(status_payload())
+    return ojson({'success': True, 'message': 'System stopped'})
+
+async def current_view():
+    """Current (location, status), read back from the Redis mirror when
+    this worker is not the one running the monitor"""
+    location = state.current_location
+    status = state.current_status
+    if location is None:
+        cached = await redis_handler.get_status()
+        if cached:
+            location = cached.get('location')
+            status = cached.get('status', status)
+    return location, status
 
 @app.route('/api/trigger-emergency', methods=['POST'])
-def trigger_emergency():
+async def trigger_emergency():
     """Manually trigger emergency (for testing)"""
-    if state.current_location:
+    location, _ = await current_view()
+    if location:
         event = {
-            'latitude': state.current_location['latitude'],
-            'longitude': state.current_location['longitude'],
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'latitude': location['latitude'],
+            'longitude': location['longitude'],
+            'timestamp': _now_iso(),
             'status': 'distress',
             'keyword': 'MANUAL_TRIGGER',
             'accuracy': 10.0
         }
-        state.events.insert(0, event)
+        await record_event(event)
         firebase_handler.store_event(event)
-        socketio.emit('emergency_alert', event)
-        return jsonify({'success': True, 'message': 'Emergency triggered'})
-    return jsonify({'success': False, 'message': 'No location available'})
+        await sio.emit('emergency_alert', event)
+        return ojson({'success': True, 'message': 'Emergency triggered'})
+    return ojson({'success': False, 'message': 'No location available'})
 
 # ==================== SOCKETIO EVENTS ====================
-@socketio.on('connect')
-def handle_connect():
+@sio.event
+async def connect(sid, environ):
     """Handle client connection"""
     state.connected_clients += 1
+    await sio.enter_room(sid, 'normal')
     print(f"✓ Client connected (total: {state.connected_clients})")
-    
-    # Send current state to new client
-    if state.current_location:
-        emit('location_update', state.current_location)
-    
-    emit('status_update', {
-        'status': state.current_status,
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
-    })
 
-@socketio.on('disconnect')
-def handle_disconnect():
+    # Send current state to new client, even when the monitor runs in
+    # another worker
+    location, status = await current_view()
+    if location:
+        await sio.emit('location_update', location, to=sid)
+
+    await sio.emit('status_update', {
+        'status': status,
+        'timestamp': _now_iso()
+    }, to=sid)
+
+@sio.event
+async def disconnect(sid):
     """Handle client disconnection"""
     state.connected_clients -= 1
     print(f"✗ Client disconnected (total: {state.connected_clients})")
 
-@socketio.on('request_location')
-def handle_location_request():
+@sio.on('request_location')
+async def handle_location_request(sid):
     """Handle location request from client"""
     if state.current_location:
-        emit('location_update', state.current_location)
+        await sio.emit('location_update', state.current_location, to=sid)
+
+@sio.on('client_pref')
+async def handle_client_pref(sid, data):
+    """Move a client into the room matching its preferred update rate"""
+    rate = data.get('rate') if isinstance(data, dict) else data
+    if rate not in Config.UPDATE_RATES:
+        return
+    for room in Config.UPDATE_RATES:
+        if room != rate:
+            await sio.leave_room(sid, room)
+    await sio.enter_room(sid, rate)
 
 # ==================== HTML TEMPLATE ====================
-def create_templates():
-    """Create templates directory and HTML file"""
-    templates_dir = Path('templates')
-    templates_dir.mkdir(exist_ok=True)
-    
-    html_content = '''<!DOCTYPE html>
+# Static dashboard page, embedded so startup never touches the disk and
+# the app can run on a read-only filesystem
+INDEX_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -382,7 +721,7 @@ def create_templates():
     <title>Women Safety System - Live Dashboard</title>
     <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
     <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <script src="https://cdn.socket.io/4.5.4/socket.io.min.js"></script>
+    <script src="https://cdn.socket.io/4.5.4/socket.io.msgpack.min.js"></script>
     <style>
         * { margin: 0; padding: 0; box-sizing: border-box; }
         
@@ -649,7 +988,11 @@ def create_templates():
         socket.on('location_update', (location) => {
             updateLocation(location);
         });
-        
+
+        socket.on('location_batch', (points) => {
+            points.forEach(updateLocation);
+        });
+
         socket.on('status_update', (status) => {
             updateStatus(status);
         });
@@ -799,22 +1142,30 @@ def create_templates():
             }
         }
         
+        let lastCursor = 0;
+
         async function loadEvents() {
-            const response = await fetch('/api/events?limit=10');
+            const response = await fetch(`/api/events?limit=10&since=${lastCursor}`);
+            if (response.status === 304) return;
             const data = await response.json();
-            
+
+            lastCursor = data.cursor;
             data.events.forEach(event => addEventToList(event));
         }
         
+        // Backgrounded tabs drop to the slow room; visible tabs come back
+        document.addEventListener('visibilitychange', () => {
+            socket.emit('client_pref', { rate: document.hidden ? 'slow' : 'normal' });
+        });
+
         if ('Notification' in window && Notification.permission === 'default') {
             Notification.requestPermission();
         }
     </script>
 </body>
 </html>'''
-    
-    (templates_dir / 'index.html').write_text(html_content)
-    print("✓ Templates created")
+
+_INDEX_ETAG = f'"{hashlib.blake2b(INDEX_HTML.encode(), digest_size=8).hexdigest()}"'
 
 # ==================== MAIN ====================
 if __name__ == '__main__':
@@ -833,8 +1184,7 @@ if __name__ == '__main__':
     print(f"\n⚠️  Press Ctrl+C to stop\n")
     print("=" * 60)
     
-    # Create templates
-    create_templates()
-    
-    # Run Flask app
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False)
+    # Run ASGI app; 'auto' picks the uvloop/httptools C implementations
+    # when installed, falling back to asyncio/h11 elsewhere
+    import uvicorn
+    uvicorn.run(asgi, host='0.0.0.0', port=5000, loop='auto', http='auto', ws='websockets')